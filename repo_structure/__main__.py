@@ -41,6 +41,14 @@ except ModuleNotFoundError:  # pragma: no cover
     default=False,
     help="Enable verbose messages for debugging and tracing.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes scanning mapped directories in parallel.",
+)
 @click.version_option(
     version=f"v{VERSION}",
     prog_name="Repo-Structure",
@@ -52,6 +60,7 @@ def repo_structure(
     follow_symlinks: bool,
     include_hidden: bool,
     verbose: bool,
+    jobs: int,
 ) -> None:
     """Ensure clean repository structure for your projects."""
     click.echo("Repo-Structure started")
@@ -59,6 +68,7 @@ def repo_structure(
     flags.follow_symlinks = follow_symlinks
     flags.include_hidden = include_hidden
     flags.verbose = verbose
+    flags.jobs = jobs
     ctx.obj = flags
 
 
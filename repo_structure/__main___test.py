@@ -22,6 +22,25 @@ def test_main_full_scan_success():
     assert result.exit_code == 0
 
 
+def test_main_full_scan_parallel_success():
+    """Test successful main run with multiple processes."""
+    runner = CliRunner()
+    result = runner.invoke(
+        repo_structure,
+        [
+            "--jobs",
+            "2",
+            "full-scan",
+            "-r",
+            ".",
+            "-c",
+            "repo_structure/test_config_allow_all.yaml",
+        ],
+    )
+
+    assert result.exit_code == 0
+
+
 def test_main_full_scan_fail_bad_config():
     """Test failing main run due to bad configuration file."""
     runner = CliRunner()
@@ -5,7 +5,9 @@ import copy
 import pprint
 import re
 from dataclasses import dataclass, field
-from typing import Dict, List, TextIO, Union, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, TextIO, Union, Any, Optional
 
 from ruamel import yaml as YAML
 from jsonschema import validate, ValidationError, SchemaError
@@ -21,6 +23,8 @@ from .repo_structure_lib import (
     StructureRuleMap,
     BUILTIN_DIRECTORY_RULES,
     TemplateError,
+    FileKey,
+    _get_file_key,
 )
 from .repo_structure_schema import get_json_schema
 
@@ -35,7 +39,12 @@ class ConfigurationData:
 
 
 class Configuration:
-    """Repo Structure configuration class."""
+    """Repo Structure configuration class.
+
+    A configuration must not be modified after construction, because scans
+    cache the entry backlogs derived from it. Its rules and mappings are
+    therefore exposed as read-only views.
+    """
 
     def __init__(
         self,
@@ -59,23 +68,19 @@ class Configuration:
         """
         if verbose:
             print("Loading configuration")
-        if param1_is_yaml_string:
-            yaml_dict = _load_repo_structure_yamls(config_file)
-        else:
-            yaml_dict = _load_repo_structure_yaml(config_file)
-
-        if not yaml_dict:
-            raise ConfigurationParseError
-
         if not schema:
-            schema = get_json_schema()
-
-        try:
-            validate(instance=yaml_dict, schema=schema)
-        except ValidationError as e:
-            raise ConfigurationParseError(f"Bad config: {e.message}") from e
-        except SchemaError as e:
-            raise ConfigurationParseError(f"Bad schema: {e.message}") from e
+            # Parsed YAML is shared between instances, keep it unmodified
+            yaml_dict = copy.deepcopy(
+                _load_validated_yaml_string(config_file)
+                if param1_is_yaml_string
+                else _load_validated_yaml_file(_get_file_key(config_file))
+            )
+        else:
+            if param1_is_yaml_string:
+                yaml_dict = _load_repo_structure_yamls(config_file)
+            else:
+                yaml_dict = _load_repo_structure_yaml(config_file)
+            _validate_yaml_dict(yaml_dict, schema)
         if verbose:
             print("Configuration validated successfully")
 
@@ -125,14 +130,14 @@ class Configuration:
                     )
 
     @property
-    def structure_rules(self) -> StructureRuleMap:
+    def structure_rules(self) -> Mapping[str, StructureRuleList]:
         """Property for structure rules."""
-        return self.config.structure_rules
+        return MappingProxyType(self.config.structure_rules)
 
     @property
-    def directory_map(self) -> DirectoryMap:
+    def directory_map(self) -> Mapping[str, List[str]]:
         """Property for directory mappings."""
-        return self.config.directory_map
+        return MappingProxyType(self.config.directory_map)
 
     @property
     def configuration_file_name(self) -> str:
@@ -150,6 +155,33 @@ def _load_repo_structure_yamls(yaml_string: Union[str, TextIO]) -> dict:
     return yaml.load(yaml_string)
 
 
+def _validate_yaml_dict(yaml_dict: dict, schema: dict) -> None:
+    if not yaml_dict:
+        raise ConfigurationParseError
+
+    try:
+        validate(instance=yaml_dict, schema=schema)
+    except ValidationError as e:
+        raise ConfigurationParseError(f"Bad config: {e.message}") from e
+    except SchemaError as e:
+        raise ConfigurationParseError(f"Bad schema: {e.message}") from e
+
+
+@lru_cache(maxsize=512)
+def _load_validated_yaml_string(yaml_string: str) -> dict:
+    # Repeatedly loaded configuration strings are parsed and validated once
+    yaml_dict = _load_repo_structure_yamls(yaml_string)
+    _validate_yaml_dict(yaml_dict, get_json_schema())
+    return yaml_dict
+
+
+@lru_cache(maxsize=64)
+def _load_validated_yaml_file(file_key: FileKey) -> dict:
+    yaml_dict = _load_repo_structure_yaml(file_key[0])
+    _validate_yaml_dict(yaml_dict, get_json_schema())
+    return yaml_dict
+
+
 def _parse_structure_rules(structure_rules_yaml: dict) -> StructureRuleMap:
 
     def _validate_use_rule_not_dangling(rules: StructureRuleMap) -> None:
@@ -219,6 +251,13 @@ def _get_is_required(entry: dict) -> bool:
     return True
 
 
+@lru_cache(maxsize=4096)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    # Template expansions and repeatedly loaded configurations share patterns,
+    # independent of the size of the re module internal cache.
+    return re.compile(pattern)
+
+
 def _parse_entry_to_repo_entry(entry: dict) -> RepoEntry:
     if_exists = []
     entry_pattern = _get_pattern(entry)
@@ -232,7 +271,7 @@ def _parse_entry_to_repo_entry(entry: dict) -> RepoEntry:
     entry_pattern = entry_pattern[0:-1] if is_dir else entry_pattern
 
     try:
-        compiled_pattern = re.compile(entry_pattern)
+        compiled_pattern = _compile_pattern(entry_pattern)
     except re.error as e:
         raise StructureRuleError(
             f"Bad pattern {entry_pattern}, failed to compile: {e}"
@@ -263,20 +302,17 @@ def _get_pattern_key(entry: dict) -> str:
 
 
 def _expand_template_entry(
-    template_yaml: List[dict], expansion_key: str, expansion_var: str
+    template_yaml: List[dict], parameter_pattern: re.Pattern, values: Dict[str, str]
 ) -> List[dict]:
-
-    def _expand_entry(entry: dict, expansion_key: str, expansion_var: str):
-        k = _get_pattern_key(entry)
-        entry[k] = entry[k].replace(f"{{{{{expansion_key}}}}}", expansion_var)
-        return entry
-
+    # All parameters are substituted in a single pass over each pattern
     expanded_yaml: List[dict] = []
     for entry in template_yaml:
-        entry = _expand_entry(entry, expansion_key, expansion_var)
+        entry = dict(entry)
+        k = _get_pattern_key(entry)
+        entry[k] = parameter_pattern.sub(lambda m: values[m[0]], entry[k])
         if "if_exists" in entry:
             entry["if_exists"] = _expand_template_entry(
-                entry["if_exists"], expansion_key, expansion_var
+                entry["if_exists"], parameter_pattern, values
             )
         expanded_yaml.append(entry)
     return expanded_yaml
@@ -297,19 +333,26 @@ def _parse_use_template(
             return max_length
 
         expansion_map = dir_map_yaml["parameters"]
+        parameter_pattern = re.compile(
+            "|".join(re.escape(f"{{{{{key}}}}}") for key in expansion_map)
+        )
         structure_rules_yaml: List[dict] = []
         for i in range(_max_values_length(expansion_map)):
             if dir_map_yaml["use_template"] not in templates_yaml:
                 raise TemplateError(
                     f"Template '{dir_map_yaml['use_template']}' not found in templates"
                 )
-            entries = copy.deepcopy(templates_yaml[dir_map_yaml["use_template"]])
-            for expansion_key, expansion_vars in expansion_map.items():
-                index = i % len(expansion_vars)
-                entries = _expand_template_entry(
-                    entries, expansion_key, expansion_vars[index]
+            values = {
+                f"{{{{{key}}}}}": expansion_vars[i % len(expansion_vars)]
+                for key, expansion_vars in expansion_map.items()
+            }
+            structure_rules_yaml.extend(
+                _expand_template_entry(
+                    templates_yaml[dir_map_yaml["use_template"]],
+                    parameter_pattern,
+                    values,
                 )
-            structure_rules_yaml.extend(entries)
+            )
         return structure_rules_yaml
 
     structure_rules_yaml = _expand_template(dir_map_yaml, templates_yaml)
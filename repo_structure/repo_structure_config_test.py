@@ -1,6 +1,8 @@
 # pylint: disable=import-error
 """Tests for repo_structure library functions."""
 
+import os
+
 import pytest
 from .repo_structure_config import (
     Configuration,
@@ -384,3 +386,86 @@ def test_fail_config_file_structure_rule_conflict():
     """
     with pytest.raises(ConfigurationParseError):
         Configuration("conflicting_test_config.yaml")
+
+
+def test_repeated_parse_of_same_yaml_string():
+    """Test that configurations parsed from the same string are independent."""
+    test_yaml = r"""
+templates:
+  component:
+    - require: '{{name}}\.py'
+directory_map:
+  /:
+    - use_template: component
+      parameters:
+        name: ['main']
+    """
+    first = Configuration(test_yaml, True)
+    second = Configuration(test_yaml, True)
+    assert first.directory_map == second.directory_map
+    assert first.structure_rules is not second.structure_rules
+    assert [
+        e.path.pattern for e in second.structure_rules["__template_rule__component"]
+    ] == [r"main\.py"]
+
+
+_FILE_CONFIG_YAML = r"""
+structure_rules:
+  base_structure:
+    - require: '{name}\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+"""
+
+
+def _write_config_file(path, name: str) -> None:
+    path.write_text(_FILE_CONFIG_YAML.format(name=name), encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+
+
+def _required_patterns(config: Configuration):
+    return [e.path.pattern for e in config.structure_rules["base_structure"]]
+
+
+def test_config_file_of_other_directory_with_same_mtime(tmp_path, monkeypatch):
+    """Test that a config file at the same relative path elsewhere is loaded."""
+    for directory, name in (("a", "AAAAAA"), ("b", "BBBBBB")):
+        (tmp_path / directory).mkdir()
+        _write_config_file(tmp_path / directory / "repo_structure.yaml", name)
+
+    monkeypatch.chdir(tmp_path / "a")
+    first = Configuration("repo_structure.yaml")
+    monkeypatch.chdir(tmp_path / "b")
+    second = Configuration("repo_structure.yaml")
+
+    assert _required_patterns(first) == [r"AAAAAA\.md"]
+    assert _required_patterns(second) == [r"BBBBBB\.md"]
+
+
+def test_edited_config_file_is_reloaded(tmp_path):
+    """Test that an edited config file is loaded again."""
+    config_path = tmp_path / "repo_structure.yaml"
+    _write_config_file(config_path, "README")
+    assert _required_patterns(Configuration(str(config_path))) == [r"README\.md"]
+
+    _write_config_file(config_path, "LICENSE")
+    os.utime(config_path, ns=(1, 1))
+    assert _required_patterns(Configuration(str(config_path))) == [r"LICENSE\.md"]
+
+
+def test_configuration_is_read_only():
+    """Test that rules and mappings cannot be replaced after construction."""
+    test_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+    """
+    config = Configuration(test_yaml, True)
+    with pytest.raises(TypeError):
+        config.structure_rules["base_structure"] = []  # type: ignore[index]
+    with pytest.raises(TypeError):
+        config.directory_map["/"] = ["ignore"]  # type: ignore[index]
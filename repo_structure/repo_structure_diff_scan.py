@@ -18,9 +18,10 @@ from .repo_structure_lib import (
     _get_matching_item_index,
     _handle_use_rule,
     _handle_if_exists,
+    _get_backlog_cache,
     Flags,
-    _map_dir_to_entry_backlog,
     StructureRuleList,
+    MappedDirNode,
     UnspecifiedEntryError,
     ForbiddenEntryError,
 )
@@ -40,31 +41,43 @@ def _incremental_path_split(path_to_split: str) -> Iterator[Tuple[str, str, bool
       ("path/to", "file" false),
     ]
     """
-    parts = path_to_split.strip("/").split("/")
-    for i, part in enumerate(parts):
-        rel_dir = "/".join(parts[:i])
-        is_directory = i < len(parts) - 1
-        yield rel_dir, part, is_directory
+    path = path_to_split.strip("/")
+    start = 0
+    while True:
+        end = path.find("/", start)
+        rel_dir = path[: start - 1] if start else ""
+        if end < 0:
+            yield rel_dir, path[start:], False
+            return
+        yield rel_dir, path[start:end], True
+        start = end + 1
 
 
 def _assert_path_in_backlog(
-    backlog: StructureRuleList, config: Configuration, flags: Flags, path: str
+    backlog: StructureRuleList,
+    config: Configuration,
+    flags: Flags,
+    path: str,
+    mapped_dirs: MappedDirNode,
 ):
+    cache = _get_backlog_cache(config)
 
     for rel_dir, entry_name, is_dir in _incremental_path_split(path):
         if _skip_entry(
             Entry(path=entry_name, rel_dir=rel_dir, is_dir=is_dir, is_symlink=False),
-            config.directory_map,
+            mapped_dirs,
             config.configuration_file_name,
             flags=flags,
         ):
             return
+        mapped_dirs = mapped_dirs.get_child(entry_name)
 
         idx = _get_matching_item_index(
             backlog,
             entry_name,
             is_dir,
             flags.verbose,
+            cache.get_matcher(backlog),
         )
         if flags.verbose:
             print(f"  Found match for path {entry_name}")
@@ -72,7 +85,7 @@ def _assert_path_in_backlog(
         if is_dir:
             backlog_match = backlog[idx]
             backlog = _handle_use_rule(
-                backlog_match.use_rule, config.structure_rules, flags, entry_name
+                backlog_match.use_rule, cache.rule_backlogs, flags, entry_name
             ) or _handle_if_exists(backlog_match, flags)
 
 
@@ -86,31 +99,48 @@ def assert_path(
     Note that this function will not be able to ensure if all required
     entries are present."""
 
-    def _get_corresponding_map_dir(c: Configuration, f: Flags, p: str):
-
+    def _get_corresponding_map_dir(
+        mapped_dirs: MappedDirNode, f: Flags, p: str
+    ) -> Tuple[str, MappedDirNode]:
+        # Descend the trie of mapped directories until the path leaves it,
+        # the last path component is never a directory
         map_dir = ""
-        for rel_dir, entry_name, is_dir in _incremental_path_split(p):
-            map_sub_dir = rel_dir_to_map_dir(os.path.join(rel_dir, entry_name))
-            if is_dir and map_sub_dir in c.directory_map:
-                map_dir = map_sub_dir
+        map_dir_node = mapped_dirs
+        names = p.strip("/").split("/")[:-1]
+        for depth, name in enumerate(names):
+            child = mapped_dirs.children.get(name)
+            if child is None:
+                break
+            mapped_dirs = child
+            if mapped_dirs.is_mapped:
+                map_dir = rel_dir_to_map_dir("/".join(names[: depth + 1]))
+                map_dir_node = mapped_dirs
 
         if f.verbose:
             print(f"Found corresponding map dir for {p}: {map_dir}")
 
-        return map_dir
+        return map_dir, map_dir_node
 
-    map_dir = _get_corresponding_map_dir(config, flags, path)
-    backlog = _map_dir_to_entry_backlog(
-        config.directory_map, config.structure_rules, map_dir_to_rel_dir(map_dir)
-    )
+    cache = _get_backlog_cache(config)
+    map_dir, map_dir_node = _get_corresponding_map_dir(cache.mapped_dirs, flags, path)
+    backlog = cache.map_dir_backlogs[rel_dir_to_map_dir(map_dir)]
     if not backlog:
         if flags.verbose:
             print("backlog empty - returning success")
         return
 
     rel_path = os.path.relpath(path, map_dir_to_rel_dir(map_dir))
+    if os.sep != "/":
+        # Paths are split and joined with "/" from here on
+        rel_path = rel_path.replace(os.sep, "/")  # pragma: no cover
     try:
-        _assert_path_in_backlog(backlog, config, flags, rel_path)
+        _assert_path_in_backlog(
+            backlog,
+            config,
+            flags,
+            rel_path,
+            map_dir_node,
+        )
     except UnspecifiedEntryError as err:
         raise UnspecifiedEntryError(
             f"Unspecified entry {path} found. Map dir: {map_dir}"
@@ -7,7 +7,7 @@ import pytest
 
 from .repo_structure_lib import UnspecifiedEntryError, Flags, ForbiddenEntryError
 from .repo_structure_config import Configuration
-from .repo_structure_diff_scan import assert_path
+from .repo_structure_diff_scan import assert_path, _incremental_path_split
 
 
 def test_matching_regex():
@@ -168,3 +168,107 @@ directory_map:
     flags.verbose = True
     assert_path(config, "README.md", flags)
     assert_path(config, "python/main.py", flags)
+
+
+def test_first_matching_entry_wins():
+    """Test that the first matching entry decides, also for grouped patterns."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - forbid: 'secret\..*'
+    - allow: '.*\.txt'
+    - allow: '(build|dist)_(\d+)\.log'
+    - allow: '(a)\1\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+    """
+    config = Configuration(config_yaml, True)
+    assert_path(config, "notes.txt")
+    assert_path(config, "build_42.log")
+    assert_path(config, "aa.md")
+    with pytest.raises(ForbiddenEntryError):
+        assert_path(config, "secret.txt")
+    with pytest.raises(UnspecifiedEntryError):
+        assert_path(config, "ab.md")
+
+
+def test_literal_and_regex_entry_order():
+    """Test that literal entries do not take precedence over earlier patterns."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - forbid: 'LICENSE'
+    - allow: '[A-Z]+'
+    - allow: '.*\.md'
+    - forbid: 'README\.md'
+    - require: 'docs/'
+      if_exists:
+        - forbid: 'index\.md'
+        - allow: '.*\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+    """
+    config = Configuration(config_yaml, True)
+    assert_path(config, "README.md")
+    assert_path(config, "AUTHORS")
+    assert_path(config, "docs/intro.md")
+    with pytest.raises(ForbiddenEntryError):
+        assert_path(config, "LICENSE")
+    with pytest.raises(ForbiddenEntryError):
+        assert_path(config, "docs/index.md")
+
+
+def test_incremental_path_split():
+    """Test splitting a path into incremental tokens."""
+    assert list(_incremental_path_split("path/to/file")) == [
+        ("", "path", True),
+        ("path", "to", True),
+        ("path/to", "file", False),
+    ]
+    assert list(_incremental_path_split("/file/")) == [("", "file", False)]
+
+
+def test_mapped_dir_relative_to_map_dir():
+    """Test that mapped directories are only skipped at their mapped location."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+    - allow: '.*/'
+      use_rule: base_structure
+  python_package:
+    - require: '.*\.py'
+directory_map:
+  /:
+    - use_rule: base_structure
+  /app/:
+    - use_rule: python_package
+  /lib/:
+    - use_rule: python_package
+    """
+    config = Configuration(config_yaml, True)
+    assert_path(config, "app/main.py")
+    assert_path(config, "lib/lib.py")
+    with pytest.raises(UnspecifiedEntryError):
+        assert_path(config, "app/lib/lib.py")
+
+
+def test_inline_flags_do_not_leak_into_other_entries():
+    """Test that a case-insensitive entry leaves the other entries case-sensitive."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - allow: 'readme_.*'
+    - allow: '(?i)license'
+directory_map:
+  /:
+    - use_rule: base_structure
+    """
+    config = Configuration(config_yaml, True)
+    assert_path(config, "readme_x")
+    assert_path(config, "LICENSE")
+    assert_path(config, "License")
+    with pytest.raises(UnspecifiedEntryError):
+        assert_path(config, "README_x")
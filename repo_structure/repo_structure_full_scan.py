@@ -3,10 +3,18 @@
 # pylint: disable=import-error
 
 import os
+import re
 
-from typing import List, Callable, Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Callable, Optional, Tuple, Union
 from gitignore_parser import parse_gitignore
 
+try:
+    from gitignore_parser import rule_from_pattern
+except ImportError:  # pragma: no cover
+    rule_from_pattern = None
+
 from .repo_structure_config import (
     Configuration,
 )
@@ -14,12 +22,15 @@ from .repo_structure_config import (
 from .repo_structure_lib import (
     map_dir_to_rel_dir,
     _skip_entry,
-    _to_entry,
+    _scan_directory,
     _get_matching_item_index,
     _handle_use_rule,
     _handle_if_exists,
-    _map_dir_to_entry_backlog,
+    _get_backlog_cache,
+    _get_file_key,
+    FileKey,
     StructureRuleList,
+    MappedDirNode,
     Flags,
     UnspecifiedEntryError,
     ForbiddenEntryError,
@@ -39,9 +50,84 @@ class EntryTypeMismatchError(Exception):
     """Exception raised when unspecified entry type is not matching the found entry."""
 
 
+GitIgnore = Union[Callable[[str], bool], None]
+
+
+GitIgnoreRules = List[Tuple[str, bool]]
+
+
+def _get_git_ignore_rules(lines: List[str]) -> Optional[GitIgnoreRules]:
+    """Translate gitignore lines into (regex, negation) pairs.
+
+    This relies on gitignore_parser internals, None if they are not available.
+    """
+    if rule_from_pattern is None:
+        return None  # pragma: no cover
+    try:
+        rules = [
+            (r.regex, r.negation)
+            for r in (rule_from_pattern(line.rstrip("\n")) for line in lines)
+            if r
+        ]
+    except (AttributeError, TypeError):
+        return None
+    if not all(isinstance(x, str) and isinstance(n, bool) for x, n in rules):
+        return None
+    return rules
+
+
+def _compile_git_ignore(rules: GitIgnoreRules) -> GitIgnore:
+    """Compile gitignore rules into a matcher for paths relative to the repo root.
+
+    Without negations, all rules are combined into one regular expression.
+    Otherwise the last matching rule decides, like in git.
+    """
+    if not rules:
+        return None
+
+    if not any(negation for _, negation in rules):
+        combined = re.compile("|".join(f"(?:{regex})" for regex, _ in rules))
+        return lambda rel_path: combined.search(rel_path) is not None
+
+    last_rule_first = [(re.compile(x), negation) for x, negation in reversed(rules)]
+
+    def _is_ignored(rel_path: str) -> bool:
+        for regex, negation in last_rule_first:
+            if regex.search(rel_path):
+                return not negation
+        return False
+
+    return _is_ignored
+
+
+def _parse_git_ignore(git_ignore_path: str) -> GitIgnore:
+    """Match with the public gitignore_parser API, for paths relative to the repo root."""
+    repo_root = os.path.dirname(git_ignore_path)
+    matches = parse_gitignore(git_ignore_path, base_dir=repo_root)
+    return lambda rel_path: matches(os.path.join(repo_root, rel_path))
+
+
+@lru_cache(maxsize=256)
+def _load_git_ignore(file_key: FileKey) -> GitIgnore:
+    git_ignore_path = file_key[0]
+    with open(git_ignore_path, "r", encoding="utf-8") as file:
+        rules = _get_git_ignore_rules(file.readlines())
+    if rules is None:
+        return _parse_git_ignore(git_ignore_path)
+    return _compile_git_ignore(rules)
+
+
+def _get_git_ignore(repo_root: str) -> GitIgnore:
+    git_ignore_path = os.path.join(repo_root, ".gitignore")
+    if os.path.isfile(git_ignore_path):
+        return _load_git_ignore(_get_file_key(git_ignore_path))
+    return None
+
+
 def _fail_if_required_entries_missing(
     rel_dir: str,
     entry_backlog: StructureRuleList,
+    counts: List[int],
 ) -> None:
 
     def _report_missing_entries(
@@ -57,8 +143,8 @@ def _fail_if_required_entries_missing(
         return result
 
     missing_required: StructureRuleList = []
-    for entry in entry_backlog:
-        if entry.is_required and entry.count == 0:
+    for entry, count in zip(entry_backlog, counts):
+        if entry.is_required and count == 0:
             missing_required.append(entry)
 
     if missing_required:
@@ -72,98 +158,141 @@ def _fail_if_required_entries_missing(
         )
 
 
-def _fail_if_invalid_repo_structure_recursive(
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def _fail_if_invalid_repo_structure(
     repo_root: str,
     rel_dir: str,
     config: Configuration,
     backlog: StructureRuleList,
     flags: Flags,
+    git_ignore: GitIgnore = None,
 ) -> None:
-
-    def _get_git_ignore(rr: str) -> Union[Callable[[str], bool], None]:
-        git_ignore_path = os.path.join(rr, ".gitignore")
-        if os.path.isfile(git_ignore_path):
-            return parse_gitignore(git_ignore_path)
-        return None
-
-    git_ignore = _get_git_ignore(repo_root)
-
-    for os_entry in os.scandir(os.path.join(repo_root, rel_dir)):
-        entry = _to_entry(os_entry, rel_dir)
-
-        if flags.verbose:
-            print(f"Checking entry {entry.path}")
-
-        if _skip_entry(
-            entry,
-            config.directory_map,
-            config.configuration_file_name,
-            git_ignore,
-            flags,
+    """Check the directory rel_dir and all its subdirectories against the backlog.
+
+    The directory tree is traversed depth first with an explicit stack of
+    (rel_dir, backlog, mapped directory trie node) tuples. Each directory is
+    checked for missing required entries as soon as its direct entries have
+    been scanned.
+    """
+    cache = _get_backlog_cache(config)
+    # Bound once, the flag is read for every entry
+    verbose = flags.verbose
+
+    stack: List[Tuple[str, StructureRuleList, MappedDirNode]] = [
+        (rel_dir, backlog, cache.mapped_dirs.get_descendant(rel_dir))
+    ]
+    while stack:
+        rel_dir, backlog, mapped_dirs = stack.pop()
+        counts = [0] * len(backlog)
+        matcher = cache.get_matcher(backlog)
+        # Number of required entries without a match yet
+        missing_required = matcher.required_count
+        for entry in _scan_directory(
+            f"{repo_root}/{rel_dir}" if rel_dir else repo_root, rel_dir
         ):
-            continue
-
-        try:
-            idx = _get_matching_item_index(
-                backlog,
-                entry.path,
-                os_entry.is_dir(),
-                flags.verbose,
-            )
-        except UnspecifiedEntryError as err:
-            raise UnspecifiedEntryError(
-                f"Unspecified entry found: '{entry.rel_dir}/{entry.path}'"
-            ) from err
-        except ForbiddenEntryError as err:
-            raise ForbiddenEntryError(
-                f"Forbidden entry found: '{entry.rel_dir}/{entry.path}'"
-            ) from err
-
-        backlog_match = backlog[idx]
-        backlog_match.count += 1
-
-        if os_entry.is_dir():
-            new_backlog = _handle_use_rule(
-                backlog_match.use_rule,
-                config.structure_rules,
+            if verbose:
+                print(f"Checking entry {entry.path}")
+
+            if _skip_entry(
+                entry,
+                mapped_dirs,
+                config.configuration_file_name,
+                git_ignore,
                 flags,
-                entry.path,
-            ) or _handle_if_exists(backlog_match, flags)
-
-            _fail_if_invalid_repo_structure_recursive(
-                repo_root,
-                os.path.join(rel_dir, entry.path),
-                config,
-                new_backlog,
-                flags,
-            )
-            _fail_if_required_entries_missing(
-                os.path.join(rel_dir, entry.path), new_backlog
-            )
+            ):
+                continue
+
+            try:
+                idx = _get_matching_item_index(
+                    backlog,
+                    entry.path,
+                    entry.is_dir,
+                    verbose,
+                    matcher,
+                )
+            except UnspecifiedEntryError as err:
+                raise UnspecifiedEntryError(
+                    f"Unspecified entry found: '{entry.rel_dir}/{entry.path}'"
+                ) from err
+            except ForbiddenEntryError as err:
+                raise ForbiddenEntryError(
+                    f"Forbidden entry found: '{entry.rel_dir}/{entry.path}'"
+                ) from err
+
+            counts[idx] += 1
+            if counts[idx] == 1 and backlog[idx].is_required:
+                missing_required -= 1
+
+            if entry.is_dir:
+                stack.append(
+                    (
+                        f"{rel_dir}/{entry.path}" if rel_dir else entry.path,
+                        _handle_use_rule(
+                            backlog[idx].use_rule,
+                            cache.rule_backlogs,
+                            flags,
+                            entry.path,
+                        )
+                        or _handle_if_exists(backlog[idx], flags),
+                        mapped_dirs.get_child(entry.path),
+                    )
+                )
+
+        if missing_required:
+            _fail_if_required_entries_missing(rel_dir, backlog, counts)
 
 
 def _process_map_dir(
-    map_dir: str, repo_root: str, config: Configuration, flags: Flags = Flags()
+    map_dir: str,
+    repo_root: str,
+    config: Configuration,
+    flags: Flags = Flags(),
+    git_ignore: GitIgnore = None,
 ):
     """Process a single map directory entry."""
     rel_dir = map_dir_to_rel_dir(map_dir)
-    backlog = _map_dir_to_entry_backlog(
-        config.directory_map, config.structure_rules, rel_dir
-    )
+    backlog = _get_backlog_cache(config).map_dir_backlogs[map_dir]
 
     if not backlog:
         if flags.verbose:
             print("backlog empty - returning success")
         return
 
-    _fail_if_invalid_repo_structure_recursive(
+    _fail_if_invalid_repo_structure(
         repo_root,
         rel_dir,
         config,
         backlog,
         flags,
+        git_ignore,
     )
-    _fail_if_required_entries_missing(rel_dir, backlog)
+
+
+def _process_map_dir_in_worker(
+    map_dir: str, repo_root: str, config: Configuration, flags: Flags
+):
+    # gitignore matchers can not be pickled, every worker parses its own
+    _process_map_dir(map_dir, repo_root, config, flags, _get_git_ignore(repo_root))
+
+
+def _process_map_dirs_in_parallel(
+    repo_root: str, config: Configuration, flags: Flags
+) -> None:
+    with ProcessPoolExecutor(max_workers=flags.jobs) as executor:
+        futures = [
+            executor.submit(
+                _process_map_dir_in_worker, map_dir, repo_root, config, flags
+            )
+            for map_dir in config.directory_map
+        ]
+        # Raise the error of the first failing map_dir, like the serial scan,
+        # without waiting for the map dirs that have not been started yet
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
 
 
 def assert_full_repository_structure(
@@ -177,5 +306,10 @@ def assert_full_repository_structure(
     if "/" not in config.directory_map:
         raise MissingMappingError("Config does not have a root mapping")
 
+    if flags.jobs > 1 and len(config.directory_map) > 1:
+        _process_map_dirs_in_parallel(repo_root, config, flags)
+        return
+
+    git_ignore = _get_git_ignore(repo_root)
     for map_dir in config.directory_map:
-        _process_map_dir(map_dir, repo_root, config, flags)
+        _process_map_dir(map_dir, repo_root, config, flags, git_ignore)
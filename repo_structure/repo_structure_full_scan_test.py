@@ -3,6 +3,11 @@
 # pylint: disable=too-many-lines
 """Tests for repo_structure library functions."""
 
+import gc
+import os
+import weakref
+from typing import List
+
 import pytest
 
 from .repo_structure_config import Configuration
@@ -10,14 +15,21 @@ from .repo_structure_full_scan import (
     MissingMappingError,
     MissingRequiredEntriesError,
     assert_full_repository_structure,
+    GitIgnore,
+    _compile_git_ignore,
+    _get_git_ignore_rules,
+    _get_git_ignore,
+    _parse_git_ignore,
 )
 from .repo_structure_lib import (
     Flags,
     UnspecifiedEntryError,
     ConfigurationParseError,
     ForbiddenEntryError,
+    _get_backlog_cache,
 )
 
+from . import repo_structure_full_scan, repo_structure_lib
 from .repo_structure_test_lib import with_repo_structure_in_tmpdir
 
 
@@ -447,6 +459,31 @@ directory_map:
         _assert_repo_directory_structure(config)
 
 
+@with_repo_structure_in_tmpdir(
+    """
+main.py
+lib/
+lib/sub/
+lib/sub/sub.py
+"""
+)
+def test_fail_use_rule_recursive_missing_required():
+    """Ensure required entries are counted per directory in recursion."""
+    config_yaml = r"""
+structure_rules:
+  python_package:
+    - require: '.*\.py'
+    - allow: '.*/'
+      use_rule: python_package
+directory_map:
+  /:
+    - use_rule: python_package
+    """
+    config = Configuration(config_yaml, True)
+    with pytest.raises(MissingRequiredEntriesError):
+        _assert_repo_directory_structure(config)
+
+
 @with_repo_structure_in_tmpdir(
     """
 main.py
@@ -978,3 +1015,227 @@ directory_map:
     flags.verbose = True
     config = Configuration(config_yaml, True)
     _assert_repo_directory_structure(config, flags)
+
+
+@with_repo_structure_in_tmpdir(
+    """
+README.md
+python/
+python/main.py
+"""
+)
+def test_repeated_scan_with_same_config():
+    """Test that repeated scans share the cached backlogs of a configuration."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+    - require: 'LICENSE'
+  python_package:
+    - require: '.*\.py'
+directory_map:
+  /:
+    - use_rule: base_structure
+  /python/:
+    - use_rule: python_package
+    """
+    config = Configuration(config_yaml, True)
+    root_backlog = list(_get_backlog_cache(config).map_dir_backlogs["/"])
+    for _ in range(2):
+        with pytest.raises(MissingRequiredEntriesError):
+            _assert_repo_directory_structure(config)
+    # Scans must not modify the cached backlogs
+    assert _get_backlog_cache(config).map_dir_backlogs["/"] == root_backlog
+
+
+@with_repo_structure_in_tmpdir(
+    """
+README.md
+"""
+)
+def test_backlog_cache_released_with_config():
+    """Test that the backlog cache does not keep scanned configurations alive."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+    """
+    config = Configuration(config_yaml, True)
+    _assert_repo_directory_structure(config)
+    config_ref = weakref.ref(config)
+    del config
+    gc.collect()
+    assert config_ref() is None
+
+
+@with_repo_structure_in_tmpdir(
+    """
+README.md
+app/
+app/main.py
+lib/
+lib/lib.py
+"""
+)
+def test_parallel_map_dirs():
+    """Test scanning mapped directories in multiple processes."""
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+  python_package:
+    - require: '.*\.py'
+directory_map:
+  /:
+    - use_rule: base_structure
+  /app/:
+    - use_rule: python_package
+  /lib/:
+    - use_rule: python_package
+    - use_rule: base_structure
+    """
+    flags = Flags()
+    flags.jobs = 2
+    config = Configuration(config_yaml, True)
+    with pytest.raises(MissingRequiredEntriesError):
+        _assert_repo_directory_structure(config, flags)
+    config_yaml = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+  python_package:
+    - require: '.*\.py'
+directory_map:
+  /:
+    - use_rule: base_structure
+  /app/:
+    - use_rule: python_package
+  /lib/:
+    - use_rule: python_package
+    """
+    config = Configuration(config_yaml, True)
+    _assert_repo_directory_structure(config, flags)
+
+
+def _compile_git_ignore_lines(lines: List[str], _tmp_path) -> GitIgnore:
+    rules = _get_git_ignore_rules(lines)
+    assert rules is not None
+    return _compile_git_ignore(rules)
+
+
+def _parse_git_ignore_lines(lines: List[str], tmp_path) -> GitIgnore:
+    (tmp_path / ".gitignore").write_text("".join(lines), encoding="utf-8")
+    return _parse_git_ignore(str(tmp_path / ".gitignore"))
+
+
+@pytest.mark.parametrize(
+    "build_git_ignore", [_compile_git_ignore_lines, _parse_git_ignore_lines]
+)
+def test_git_ignore(build_git_ignore, tmp_path):
+    """Test gitignore matching of paths relative to the repository root."""
+    for lines in (["*.log\n", "/build\n"], ["*.log\n", "/build\n", "!keep.log\n"]):
+        is_ignored = build_git_ignore(lines, tmp_path)
+        assert is_ignored is not None
+        assert is_ignored("debug.log")
+        assert is_ignored("sub/debug.log")
+        assert is_ignored("build")
+        assert not is_ignored("sub/build")
+        assert not is_ignored("README.md")
+
+    is_ignored = build_git_ignore(["*.log\n", "!keep.log\n"], tmp_path)
+    assert is_ignored is not None
+    assert not is_ignored("keep.log")
+    assert not is_ignored("sub/keep.log")
+
+
+def test_compile_git_ignore_without_rules():
+    """Test that gitignore files without rules do not create a matcher."""
+    rules = _get_git_ignore_rules(["# comment\n", "\n"])
+    assert rules == []
+    assert _compile_git_ignore(rules) is None
+
+
+def test_git_ignore_rules_unavailable(monkeypatch):
+    """Test the fallback signal for changed gitignore_parser internals."""
+
+    def _rule_without_regex(pattern):
+        return object() if pattern else None
+
+    monkeypatch.setattr(
+        repo_structure_full_scan, "rule_from_pattern", _rule_without_regex
+    )
+    assert _get_git_ignore_rules(["*.log\n"]) is None
+
+
+def test_git_ignore_of_other_repo_with_same_mtime(tmp_path, monkeypatch):
+    """Test that a .gitignore at the same relative path in another repo is loaded."""
+    for repo, pattern in (("a", "*.log"), ("b", "*.tmp")):
+        (tmp_path / repo).mkdir()
+        git_ignore_path = tmp_path / repo / ".gitignore"
+        git_ignore_path.write_text(f"{pattern}\n", encoding="utf-8")
+        os.utime(git_ignore_path, ns=(0, 0))
+
+    monkeypatch.chdir(tmp_path / "a")
+    git_ignore_a = _get_git_ignore(".")
+    monkeypatch.chdir(tmp_path / "b")
+    git_ignore_b = _get_git_ignore(".")
+
+    assert git_ignore_a("debug.log") and not git_ignore_a("debug.tmp")
+    assert git_ignore_b("debug.tmp") and not git_ignore_b("debug.log")
+
+
+_OPTIONAL_DOC_CONFIG_YAML = r"""
+structure_rules:
+  base_structure:
+    - require: 'README\.md'
+    - allow: 'doc/'
+      if_exists:
+        - require: 'index\.md'
+directory_map:
+  /:
+    - use_rule: base_structure
+"""
+
+
+def _count_backlog_matchers(monkeypatch) -> List[int]:
+    built = [0]
+    backlog_matcher = repo_structure_lib.BacklogMatcher
+
+    def _counting_backlog_matcher(*args, **kwargs):
+        built[0] += 1
+        return backlog_matcher(*args, **kwargs)
+
+    monkeypatch.setattr(repo_structure_lib, "BacklogMatcher", _counting_backlog_matcher)
+    return built
+
+
+@with_repo_structure_in_tmpdir(
+    """
+README.md
+"""
+)
+def test_optional_dir_absent(monkeypatch):
+    """Test that entries of an absent optional directory are not required."""
+    built = _count_backlog_matchers(monkeypatch)
+    config = Configuration(_OPTIONAL_DOC_CONFIG_YAML, True)
+    _assert_repo_directory_structure(config)
+    # Only the root directory has been scanned
+    assert built[0] == 1
+
+
+@with_repo_structure_in_tmpdir(
+    """
+README.md
+doc/
+"""
+)
+def test_optional_dir_present_missing_required(monkeypatch):
+    """Test that entries of a present optional directory are required."""
+    built = _count_backlog_matchers(monkeypatch)
+    config = Configuration(_OPTIONAL_DOC_CONFIG_YAML, True)
+    with pytest.raises(MissingRequiredEntriesError):
+        _assert_repo_directory_structure(config)
+    assert built[0] == 2
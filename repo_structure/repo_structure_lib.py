@@ -2,9 +2,23 @@
 
 import os
 import re
+import weakref
 from dataclasses import dataclass, field
 from os import DirEntry
-from typing import List, Union, Callable, Dict, Final
+from typing import (
+    List,
+    Union,
+    Callable,
+    Dict,
+    Final,
+    Mapping,
+    Optional,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from .repo_structure_config import Configuration  # pragma: no cover
 
 BUILTIN_DIRECTORY_RULES: Final = ["ignore"]
 
@@ -44,13 +58,15 @@ class RepoEntry:
     is_forbidden: bool
     use_rule: str = ""
     if_exists: List["RepoEntry"] = field(default_factory=list)
-    count: int = 0
 
 
 @dataclass
 class Entry:
     """Internal representation of a directory entry."""
 
+    # One instance is created per scanned entry, so avoid a __dict__ each
+    __slots__ = ("path", "rel_dir", "is_dir", "is_symlink")
+
     path: str
     rel_dir: str
     is_dir: bool
@@ -64,6 +80,55 @@ class Flags:
     follow_symlinks: bool = False
     include_hidden: bool = True
     verbose: bool = False
+    jobs: int = 1
+
+
+@dataclass
+class EntryMatcher:
+    """Matches entry names of one entry type against the entries of a backlog.
+
+    Literal patterns are looked up by name, all other patterns are combined
+    into one regular expression. Every alternative of the combined pattern
+    wraps exactly one backlog entry in a named group, group_indexes maps the
+    number of that group back to the backlog index. The pattern is None if
+    the entries could not be combined and need to be matched one by one.
+    """
+
+    literals: Dict[str, int] = field(default_factory=dict)
+    regex_indexes: List[int] = field(default_factory=list)
+    pattern: Optional[re.Pattern] = None
+    group_indexes: List[int] = field(default_factory=list)
+
+
+@dataclass
+class BacklogMatcher:
+    """Entry matchers for the files and the directories of a backlog."""
+
+    files: EntryMatcher = field(default_factory=EntryMatcher)
+    dirs: EntryMatcher = field(default_factory=EntryMatcher)
+    required_count: int = 0
+
+
+@dataclass
+class MappedDirNode:
+    """Node of the trie of mapped directories, children are keyed by name."""
+
+    is_mapped: bool = False
+    children: Dict[str, "MappedDirNode"] = field(default_factory=dict)
+
+    def get_child(self, name: str) -> "MappedDirNode":
+        """Get the child node for a directory name, an unmapped leaf if absent."""
+        return self.children.get(name, _UNMAPPED_DIR_NODE)
+
+    def get_descendant(self, rel_dir: str) -> "MappedDirNode":
+        """Get the node for a directory path relative to this node."""
+        node = self
+        for name in rel_dir.split("/") if rel_dir else []:
+            node = node.get_child(name)
+        return node
+
+
+_UNMAPPED_DIR_NODE: Final = MappedDirNode()
 
 
 DirectoryMap = Dict[str, List[str]]
@@ -71,6 +136,32 @@ StructureRuleList = List[RepoEntry]
 StructureRuleMap = Dict[str, StructureRuleList]
 
 
+@dataclass
+class BacklogCache:
+    """Backlogs and matchers of a configuration, computed once per configuration.
+
+    Matchers are built on first use and keyed by the id of their backlog. The
+    backlog is stored along with its matcher, so that its id is not reused while
+    the entry exists. The mapped directories are stored as a trie of directory
+    names.
+    """
+
+    map_dir_backlogs: Dict[str, StructureRuleList] = field(default_factory=dict)
+    rule_backlogs: Dict[str, StructureRuleList] = field(default_factory=dict)
+    matchers: Dict[int, Tuple[StructureRuleList, BacklogMatcher]] = field(
+        default_factory=dict
+    )
+    mapped_dirs: MappedDirNode = field(default_factory=MappedDirNode)
+
+    def get_matcher(self, backlog: StructureRuleList) -> BacklogMatcher:
+        """Get the matcher of a backlog, build it if the backlog is new."""
+        entry = self.matchers.get(id(backlog))
+        if entry is None or entry[0] is not backlog:
+            entry = backlog, _build_backlog_matcher(backlog)
+            self.matchers[id(backlog)] = entry
+        return entry[1]
+
+
 def rel_dir_to_map_dir(rel_dir: str):
     """Convert a relative directory path to a mapped directory path.
 
@@ -105,32 +196,31 @@ def map_dir_to_rel_dir(map_dir: str) -> str:
 
 def _skip_entry(
     entry: Entry,
-    directory_map: DirectoryMap,
+    mapped_dirs: MappedDirNode,
     config_file_name: str,
     git_ignore: Union[Callable[[str], bool], None] = None,
     flags: Flags = Flags(),
 ) -> bool:
-    skip_conditions = [
-        (not flags.follow_symlinks and entry.is_symlink),
-        (not flags.include_hidden and entry.path.startswith(".")),
-        (entry.path == ".gitignore" and not entry.is_dir),
-        (entry.path == ".git" and entry.is_dir),
-        (git_ignore and git_ignore(entry.path)),
-        (
-            entry.is_dir
-            and rel_dir_to_map_dir(os.path.join(entry.rel_dir, entry.path))
-            in directory_map
-        ),
-        (entry.path == config_file_name),
-    ]
-
-    for condition in skip_conditions:
-        if condition:
-            if flags.verbose:
-                print(f"Skipping {entry.path}")
-            return True
-
-    return False
+    # mapped_dirs is the trie node of entry.rel_dir
+    # Short-circuit evaluation with the cheapest conditions first
+    skip = (
+        (entry.is_symlink and not flags.follow_symlinks)
+        or (not flags.include_hidden and entry.path.startswith("."))
+        or entry.path == config_file_name
+        or (entry.path == ".gitignore" and not entry.is_dir)
+        or (entry.path == ".git" and entry.is_dir)
+        or (entry.is_dir and mapped_dirs.get_child(entry.path).is_mapped)
+        or (
+            git_ignore is not None
+            and git_ignore(
+                f"{entry.rel_dir}/{entry.path}" if entry.rel_dir else entry.path
+            )
+        )
+    )
+
+    if skip and flags.verbose:
+        print(f"Skipping {entry.path}")
+    return bool(skip)
 
 
 def _to_entry(os_entry: DirEntry[str], rel_dir: str) -> Entry:
@@ -142,19 +232,144 @@ def _to_entry(os_entry: DirEntry[str], rel_dir: str) -> Entry:
     )
 
 
+FileKey = Tuple[str, int, int, int, int]
+
+
+def _get_file_key(path: str) -> FileKey:
+    """Identify a file for caching what is parsed from it across calls.
+
+    The path is resolved, so that the same relative path in another working
+    directory or repository is a different key. Device, inode, size and
+    modification time change when the file is replaced or edited.
+    """
+    real_path = os.path.realpath(path)
+    stat = os.stat(real_path)
+    return real_path, stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _scan_directory(path: str, rel_dir: str) -> List[Entry]:
+    """Read all entries of a directory at once and close its handle again."""
+    with os.scandir(path) as it:
+        return [_to_entry(os_entry, rel_dir) for os_entry in it]
+
+
+_LITERAL_PATTERN: Final = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*")
+_ESCAPED_CHAR_PATTERN: Final = re.compile(r"\\(.)")
+
+
+def _get_literal(pattern: re.Pattern) -> Optional[str]:
+    """Return the string matched by a pattern without metacharacters, else None."""
+    if not _LITERAL_PATTERN.fullmatch(pattern.pattern):
+        return None
+    return _ESCAPED_CHAR_PATTERN.sub(r"\1", pattern.pattern)
+
+
+_NUMBERED_REFERENCE_PATTERN: Final = re.compile(r"\\[1-9]|\(\?\(\d")
+_GLOBAL_INLINE_FLAGS_PATTERN: Final = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+def _combine_patterns(patterns: List[re.Pattern]) -> Optional[re.Pattern]:
+    # The wrapping groups shift the group numbering, patterns referring to
+    # their groups by number are not combined. Global inline flags would
+    # apply to all alternatives (Python < 3.11 only warns about them when
+    # they are not at the start), such patterns are not combined either.
+    if not patterns or any(
+        _NUMBERED_REFERENCE_PATTERN.search(p.pattern)
+        or _GLOBAL_INLINE_FLAGS_PATTERN.search(p.pattern)
+        for p in patterns
+    ):
+        return None
+    alternatives = "|".join(f"(?P<_{i}>{p.pattern})" for i, p in enumerate(patterns))
+    try:
+        # Anchored at the end, so that match() behaves like fullmatch()
+        return re.compile(f"(?:{alternatives})\\Z")
+    except re.error:
+        # e.g. a group name used by more than one pattern
+        return None
+
+
+def _build_entry_matcher(backlog: StructureRuleList, is_dir: bool) -> EntryMatcher:
+    result = EntryMatcher()
+    for i, v in enumerate(backlog):
+        if v.is_dir != is_dir:
+            continue
+        literal = _get_literal(v.path)
+        if literal is None:
+            result.regex_indexes.append(i)
+        elif literal not in result.literals:
+            result.literals[literal] = i
+    result.pattern = _combine_patterns([backlog[i].path for i in result.regex_indexes])
+    if result.pattern is not None:
+        # The wrapping group encloses all groups of its pattern and is thus
+        # always the last matched group of a match
+        result.group_indexes = [-1] * (result.pattern.groups + 1)
+        for k, i in enumerate(result.regex_indexes):
+            result.group_indexes[result.pattern.groupindex[f"_{k}"]] = i
+    return result
+
+
+def _build_backlog_matcher(backlog: StructureRuleList) -> BacklogMatcher:
+    return BacklogMatcher(
+        files=_build_entry_matcher(backlog, False),
+        dirs=_build_entry_matcher(backlog, True),
+        required_count=sum(1 for v in backlog if v.is_required),
+    )
+
+
+def _find_matching_item_index(
+    backlog: StructureRuleList,
+    entry_path: str,
+    is_dir: bool,
+    matcher: Optional[BacklogMatcher],
+) -> int:
+    if not matcher:
+        for i, v in enumerate(backlog):
+            if v.is_dir == is_dir and v.path.fullmatch(entry_path):
+                return i
+        return -1
+
+    m = matcher.dirs if is_dir else matcher.files
+    literal_index = m.literals.get(entry_path, -1)
+    # The first matching entry wins, regexes are only relevant if one of
+    # them precedes the literal match
+    if literal_index >= 0 and (
+        not m.regex_indexes or literal_index < m.regex_indexes[0]
+    ):
+        return literal_index
+
+    regex_index = -1
+    if m.pattern is not None:
+        match = m.pattern.match(entry_path)
+        if match and match.lastindex:
+            regex_index = m.group_indexes[match.lastindex]
+    else:
+        for i in m.regex_indexes:
+            if 0 <= literal_index < i:
+                break
+            if backlog[i].path.fullmatch(entry_path):
+                regex_index = i
+                break
+
+    if regex_index >= 0 and (literal_index < 0 or regex_index < literal_index):
+        return regex_index
+    return literal_index
+
+
 def _get_matching_item_index(
     backlog: StructureRuleList,
     entry_path: str,
     is_dir: bool,
     verbose: bool = False,
+    matcher: Optional[BacklogMatcher] = None,
 ) -> int:
-    for i, v in enumerate(backlog):
-        if v.path.fullmatch(entry_path) and v.is_dir == is_dir:
-            if v.is_forbidden:
-                raise ForbiddenEntryError(f"Found forbidden entry: {entry_path}")
-            if verbose:
-                print(f"  Found match at index {i}: {v.path.pattern}")
-            return i
+    i = _find_matching_item_index(backlog, entry_path, is_dir, matcher)
+    if i >= 0:
+        v = backlog[i]
+        if v.is_forbidden:
+            raise ForbiddenEntryError(f"Found forbidden entry: {entry_path}")
+        if verbose:
+            print(f"  Found match at index {i}: {v.path.pattern}")
+        return i
 
     if is_dir:
         entry_path += "/"
@@ -163,17 +378,14 @@ def _get_matching_item_index(
 
 def _handle_use_rule(
     use_rule: str,
-    structure_rules: StructureRuleMap,
+    rule_backlogs: Dict[str, StructureRuleList],
     flags: Flags,
     rel_path: str,
 ):
     if use_rule:
         if flags.verbose:
             print(f"use_rule found for rel path {rel_path}")
-        return _build_active_entry_backlog(
-            [use_rule],
-            structure_rules,
-        )
+        return rule_backlogs[use_rule]
     return None
 
 
@@ -187,13 +399,13 @@ def _handle_if_exists(backlog_entry: RepoEntry, flags: Flags):
 
 
 def _map_dir_to_entry_backlog(
-    directory_map: DirectoryMap,
-    structure_rules: StructureRuleMap,
+    directory_map: Mapping[str, List[str]],
+    structure_rules: Mapping[str, StructureRuleList],
     map_dir: str,
 ) -> StructureRuleList:
 
     def _get_use_rules_for_directory(
-        directory_map: DirectoryMap, directory: str
+        directory_map: Mapping[str, List[str]], directory: str
     ) -> List[str]:
         d = rel_dir_to_map_dir(directory)
         return directory_map[d]
@@ -203,7 +415,7 @@ def _map_dir_to_entry_backlog(
 
 
 def _build_active_entry_backlog(
-    active_use_rules: List[str], structure_rules: StructureRuleMap
+    active_use_rules: List[str], structure_rules: Mapping[str, StructureRuleList]
 ) -> StructureRuleList:
     result: StructureRuleList = []
     for rule in active_use_rules:
@@ -211,3 +423,40 @@ def _build_active_entry_backlog(
             continue
         result += structure_rules[rule]
     return result
+
+
+def _build_backlog_cache(
+    directory_map: Mapping[str, List[str]],
+    structure_rules: Mapping[str, StructureRuleList],
+) -> BacklogCache:
+
+    result = BacklogCache()
+    for map_dir in directory_map:
+        node = result.mapped_dirs
+        rel_dir = map_dir_to_rel_dir(map_dir)
+        for name in rel_dir.split("/") if rel_dir else []:
+            node = node.children.setdefault(name, MappedDirNode())
+        node.is_mapped = True
+        result.map_dir_backlogs[map_dir] = _map_dir_to_entry_backlog(
+            directory_map, structure_rules, map_dir_to_rel_dir(map_dir)
+        )
+    for rule in structure_rules:
+        result.rule_backlogs[rule] = _build_active_entry_backlog(
+            [rule], structure_rules
+        )
+    return result
+
+
+# Weakly keyed, so that a cache entry is dropped together with its configuration
+_BACKLOG_CACHES: "weakref.WeakKeyDictionary[Configuration, BacklogCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_backlog_cache(config: "Configuration") -> BacklogCache:
+    """Get the backlog cache of a configuration, built on first use."""
+    cache = _BACKLOG_CACHES.get(config)
+    if cache is None:
+        cache = _build_backlog_cache(config.directory_map, config.structure_rules)
+        _BACKLOG_CACHES[config] = cache
+    return cache
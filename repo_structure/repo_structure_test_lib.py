@@ -3,7 +3,7 @@
 import os
 import shutil
 import tempfile
-from typing import Callable, TypeVar
+from typing import Callable, List, Tuple, TypeVar
 from pathlib import Path
 import random
 import string
@@ -11,6 +11,10 @@ import functools
 
 
 def _get_tmp_dir() -> str:
+    # Prefer the memory backed /dev/shm for the metadata heavy test trees,
+    # unless a temporary directory has been set explicitly with TMPDIR
+    if "TMPDIR" not in os.environ and os.access("/dev/shm", os.W_OK):
+        return tempfile.mkdtemp(dir="/dev/shm")
     return tempfile.mkdtemp()
 
 
@@ -18,9 +22,11 @@ def _remove_tmp_dir(tmpdir: str) -> None:
     shutil.rmtree(tmpdir)
 
 
-def _create_repo_directory_structure(specification: str) -> None:
-    """Creates a directory structure based on a specification file.
-    Must be run in the target directory.
+RepoSpecification = Tuple[List[str], List[Tuple[str, bytes]], List[Tuple[str, str]]]
+
+
+def _parse_repo_directory_specification(specification: str) -> RepoSpecification:
+    """Parse a specification into directories, files and symbolic links.
 
     A specification file can contain the following entries:
     | Entry                      | Meaning                                                         |
@@ -28,31 +34,52 @@ def _create_repo_directory_structure(specification: str) -> None:
     | <filename>:<content>       | File with content <content> (single line only)                  |
     | <dirname>/                 | Directory                                                       |
     | <linkname> -> <targetfile> | Symbolic link with the name <linkname> pointing to <targetfile> |
+
+    Directories are deduplicated and sorted by depth, so that parents are
+    created first.
     """
-    for item in iter(specification.splitlines()):
-        if item.startswith("#") or item.strip() == "":
+    dirs: List[str] = []
+    files: List[Tuple[str, bytes]] = []
+    links: List[Tuple[str, str]] = []
+    for item in specification.splitlines():
+        item = item.strip()
+        if item.startswith("#") or item == "":
             continue
-        if item.strip().endswith("/"):
-            os.makedirs(item.strip(), exist_ok=True)
+        if item.endswith("/"):
+            dirs.append(item.rstrip("/"))
         elif "->" in item:
-            link_name, target_file = item.strip().split("->")
-            os.symlink(target_file.strip(), link_name.strip())
+            link_name, _, target_file = item.partition("->")
+            links.append((link_name.strip(), target_file.strip()))
         else:
-            file_content = "Created for testing only"
-            if ":" in item:
-                file_name, file_content = item.strip().split(":")
-            else:
-                file_name = item.strip()
-            with open(file_name.strip(), "w", encoding="utf-8") as f:
-                f.write(file_content.strip() + "\r\n")
-
-
-def _clear_repo_directory_structure() -> None:
-    for root, dirs, files in os.walk(".", topdown=False):
-        for name in files:
-            os.remove(os.path.join(root, name))
-        for name in dirs:
-            os.rmdir(os.path.join(root, name))
+            file_name, separator, file_content = item.partition(":")
+            if not separator:
+                file_content = "Created for testing only"
+            files.append(
+                (file_name.strip(), (file_content.strip() + "\r\n").encode("utf-8"))
+            )
+    # Parent directories of files and links do not need to be listed
+    dirs.extend(os.path.dirname(name) for name, _ in (*files, *links))
+    return sorted(set(filter(None, dirs)), key=lambda d: d.count("/")), files, links
+
+
+def _materialize_repo_directory_structure(specification: RepoSpecification) -> None:
+    """Create a parsed specification. Must be run in the target directory."""
+    dirs, files, links = specification
+    for dir_name in dirs:
+        try:
+            os.mkdir(dir_name)
+        except FileNotFoundError:
+            # Parent directory not part of the specification
+            os.makedirs(dir_name)
+    for file_name, file_content in files:
+        # Contents are tiny, write them unbuffered in a single call
+        fd = os.open(file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, file_content)
+        finally:
+            os.close(fd)
+    for link_name, target_file in links:
+        os.symlink(target_file, link_name)
 
 
 R = TypeVar("R")
@@ -61,17 +88,19 @@ R = TypeVar("R")
 def with_repo_structure_in_tmpdir(specification: str):
     """Create and remove repo structure based on specification for testing. Use as decorator."""
 
+    parsed_specification = _parse_repo_directory_specification(specification)
+
     def decorator(func: Callable[..., R]) -> Callable[..., R]:
 
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             cwd = os.getcwd()
             tmpdir = _get_tmp_dir()
             os.chdir(tmpdir)
-            _create_repo_directory_structure(specification)
+            _materialize_repo_directory_structure(parsed_specification)
             try:
                 result = func(*args, **kwargs)
             finally:
-                _clear_repo_directory_structure()
                 os.chdir(cwd)
                 _remove_tmp_dir(tmpdir)
             return result
@@ -138,7 +167,6 @@ def with_random_repo_structure_in_tmpdir(
             try:
                 result = func(*args, **kwargs)
             finally:
-                _clear_repo_directory_structure()
                 os.chdir(cwd)
                 _remove_tmp_dir(tmpdir)
             return result